@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：bench_import.py
+测量冷启动导入rtsp_client的耗时，超过预算时返回非0，可以放到CI里面防止导入变慢
+用法: python benchmarks/bench_import.py [--budget-ms 50] [--runs 10]
+'''
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 收流核心路径不允许在导入时加载的重量级模块
+FORBIDDEN_MODULES = ('cv2', 'bitstring', 'numpy', 'log')
+IMPORT_TIME_PATTERN = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)')
+
+
+def measure_once(module):
+    """
+    在新的解释器进程里导入模块，用-X importtime统计累计耗时
+    :param module: 模块名
+    :return: 导入耗时(微秒)，导入时加载的禁止模块列表
+    """
+    code = 'import sys, {0}; print(",".join(m for m in {1!r} if m in sys.modules))'.format(module, FORBIDDEN_MODULES)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match and match.group(3) == module:
+            cumulative_us = int(match.group(2))
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative_us, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='rtsp_client cold import benchmark')
+    parser.add_argument('--module', default='rtsp_client')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        cumulative_us, loaded = measure_once(args.module)
+        if loaded:
+            print('FAIL: 导入 {} 时加载了 {}'.format(args.module, ', '.join(loaded)))
+            return 1
+        samples.append(cumulative_us / 1000.0)
+    median_ms = statistics.median(samples)
+    print('import {}: median {:.2f} ms, min {:.2f} ms, max {:.2f} ms ({} runs, budget {:.2f} ms)'.format(
+        args.module, median_ms, min(samples), max(samples), args.runs, args.budget_ms))
+    if median_ms > args.budget_ms:
+        print('FAIL: 导入耗时超过预算')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：__init__.py
+'''
+import logging
+
+from .base import RtspClientBase
+from .frame import Frame, FramePool
+from .tcp import RtspClientTcp
+from .udp import RtspClientUdp
+from .multicast import MulticastGroup
+from .client import RtspClient, RTPProtocol
+from .receive_mode import ReceiveMode, PacketFilter
+from .trace import FrameTracer, TraceStage
+from .timestamps import exposure_timestamps
+
+# 日志输出由使用者配置，库本身不创建文件或者handler
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+__all__ = ['RtspClientBase', 'RtspClientTcp', 'RtspClientUdp', 'MulticastGroup', 'RtspClient', 'RTPProtocol',
+           'Frame', 'FramePool', 'ReceiveMode', 'PacketFilter', 'FrameTracer', 'TraceStage', 'exposure_timestamps']
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：_optional.py
+'''
+import importlib
+
+
+def import_optional(module_name, package_name, feature):
+    """
+    在用到可选功能时才导入第三方模块，没有安装时给出安装提示
+    :param module_name: 模块名，例如cv2
+    :param package_name: pip安装的包名，例如opencv-python
+    :param feature: 需要这个模块的功能，用于错误提示
+    :return: 导入的模块
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError('{}需要安装{}: pip install {}'.format(feature, package_name, package_name)) from e
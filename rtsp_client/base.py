@@ -0,0 +1,624 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：base.py
+@Author  ：huangwenxi
+@Date    ：2022/4/24 17:27 
+'''
+import time
+import logging
+import socket
+import struct
+import threading
+import abc
+import re
+import queue
+from .frame import FramePool, RtpPacket, frame_size
+from .trace import FrameTracer, DEFAULT_TRACE_WINDOW, DEFAULT_PERCENTILES
+
+logger = logging.getLogger(__name__)
+MAX_BUFFER_LEN = 10240
+# 接收线程阻塞在recv上的最长时间，超时后检查一次停止标志，保证线程可以被回收
+SOCKET_TIMEOUT = 0.5
+# 线程退出时等待的最长时间
+THREAD_JOIN_TIMEOUT = 1.0
+NAL_START_CODE = "\x00\x00\x00\x01"
+NAL_START_CODE_BYTES = NAL_START_CODE.encode()
+# FU-A第一个分片需要加在负载前面的起始码和重建的NAL头，按NAL头的值预先生成
+FU_A_START_PREFIXES = tuple(NAL_START_CODE_BYTES + bytes((nal_header,)) for nal_header in range(256))
+RTP_FIXED_HEADER_LEN = 12
+RTP_TIMESTAMP_STRUCT = struct.Struct('!I')
+# 接收所有数据的接收模式，receive_mode.ReceiveMode.ALL使用同一个值
+RECEIVE_MODE_ALL = 0
+BIT_SIZE_2_BYTES = 16
+BIT_SIZE_4_BYTES = 32
+
+
+class RTSPCmd:
+    OPTIONS = 'OPTIONS'
+    DESCRIBE = 'DESCRIBE'
+    SETUP = 'SETUP'
+    PLAY = 'PLAY'
+
+
+class RTPHeader:
+    RTP_VER_START_BIT = 0
+    RTP_VER_END_BIT = 2
+    RTP_PADDING_START_BIT = 2
+    RTP_PADDING_END_BIT = 3
+    RTP_EXTENSION_START_BIT = 3
+    RTP_EXTENSION_END_BIT = 4
+    RTP_CSRC_COUNT_START_BIT = 4
+    RTP_CSRC_COUNT_END_BIT = 8
+    RTP_MARK_START_BIT = 8
+    RTP_MARK_END_BIT = 9
+    RTP_PAYLOAD_START_BIT = 9
+    RTP_PAYLOAD_END_BIT = 16
+    RTP_SEQUENCE_NUMBER_START_BIT = 16
+    RTP_SEQUENCE_NUMBER_END_BIT = 32
+    RTP_TIMESTAMP_START_BIT = 32
+    RTP_TIMESTAMP_END_BIT = 64
+    RTP_SSRC_START_BIT = 64
+    RTP_SSRC_END_BIT = 96
+    RTP_CSRC_START_BIT = 96
+
+
+class RTSPCSeq:
+    OPTIONS = 1
+    DESCRIBE = 2
+    SETUP_VIDEO = 3
+    SETUP_AUDIO = 4
+    PLAY = 5
+
+
+class RTPFragmentType:
+    SINGLE_NAL_MAX = 23
+    FU_A = 28
+
+
+class NALUnitType:
+    NONE_IDX = 1
+    A = 2
+    B = 3
+    C = 4
+    IDX = 5
+    SEI = 6
+    SPS = 7
+    PPS = 8
+
+
+# 推送给消费者的流结束标志，连接断开或者出错时放入帧队列
+_STREAM_END = object()
+
+
+class RtspClientBase(metaclass=abc.ABCMeta):
+    def __init__(self, rtsp_server_ip, rtsp_server_port, url):
+        self._rtsp_server_ip = rtsp_server_ip
+        self._rtsp_server_port = rtsp_server_port
+        self._url = url
+        self._rtsp_session_connection_status = False
+        self._rtsp_session_id = 0
+        self._rtsp_session_timeout = 0
+        self._cseq_function_map = {RTSPCSeq.OPTIONS: self._parse_option_response,
+                                   RTSPCSeq.DESCRIBE: self._parse_describe_response,
+                                   RTSPCSeq.SETUP_VIDEO: self._parse_setup_video_response,
+                                   RTSPCSeq.SETUP_AUDIO: self._parse_setup_audio_response,
+                                   RTSPCSeq.PLAY: self._parse_play_response}
+        self._rtp_socket = None
+        self._i_received_flag = False
+        self._frame_queue = queue.Queue()
+        self._frame_pool = FramePool()
+        self._rtp_packet = RtpPacket()
+        self._rtsp_socket = None
+        self._stop_event = threading.Event()
+        self._tasks = []
+        self._stream_end_lock = threading.Lock()
+        self._stream_ended = False
+        self._tracer = None
+        self._packet_filter = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+        return False
+
+    def connect(self):
+        """
+        连接到rtsp服务器，断开或者视频流结束之后可以再次调用重新连接
+        :return: 返回连接的结果，True表示成功 False表示失败
+        """
+        if not self._reset_session():
+            return False
+        if not self._init_rtsp_session():
+            self._abort_connect()
+            return False
+        logger.info('启动RTSP消息解析任务')
+        if not self._create():
+            self._abort_connect()
+            return False
+        return True
+
+    def _reset_session(self):
+        """
+        重新连接之前释放上一次会话的资源，并清除停止标志和队列中遗留的结束标志
+        :return: True 可以建立新的会话 False上一次会话的接收线程没有退出
+        """
+        if self._tasks:
+            # 上一次会话因为服务器断开而结束时，接收线程已经退出，这里回收线程并关闭socket
+            self.disconnect()
+        if self._tasks:
+            logger.error('上一次会话的接收线程没有退出，无法重新连接')
+            return False
+        self._stop_event.clear()
+        with self._stream_end_lock:
+            self._stream_ended = False
+        while True:
+            try:
+                self._frame_queue.get_nowait()
+            except queue.Empty:
+                break
+        self._i_received_flag = False
+        self._rtsp_session_id = 0
+        self._rtsp_session_timeout = 0
+        return True
+
+    def _abort_connect(self):
+        """
+        连接失败时释放已经创建的socket，并通知消费者视频流已经结束，避免read_frame一直阻塞
+        :return:
+        """
+        self._stop_event.set()
+        self.disconnect()
+
+    @abc.abstractmethod
+    def disconnect(self):
+        """
+        释放资源，比如说创建的rtp rtcp rtsp的socket
+        :return:
+        """
+
+    def read_frame(self, timeout=None):
+        """
+        读取视频流数据
+        :param timeout: 等待数据的最长时间(秒)，None表示一直等待，超时抛出queue.Empty
+        :return: 视频流数据Frame，可以解包成[视频帧，曝光时间]，用完后调用release()复用缓冲区；
+                 连接断开或者出错后返回None
+        """
+        frame = self._frame_queue.get(timeout=timeout)
+        if frame is _STREAM_END:
+            # 放回结束标志，保证后续的读取和其他消费者也能立即返回
+            self._frame_queue.put(_STREAM_END)
+            return None
+        trace = frame.trace
+        if trace is not None:
+            trace.dequeued_ns = time.monotonic_ns()
+            tracer = self._tracer
+            if tracer is not None:
+                tracer.record(trace)
+        return frame
+
+    def read_frames(self, count, timeout=None):
+        """
+        批量读取视频流数据，可以配合timestamps.exposure_timestamps批量解析其中带扩展头的帧的曝光时间
+        :param count: 读取的帧数
+        :param timeout: 等待每一帧的最长时间(秒)，None表示一直等待，超时抛出queue.Empty
+        :return: Frame列表，连接断开时返回已经读到的帧
+        """
+        frames = []
+        for _ in range(count):
+            frame = self.read_frame(timeout)
+            if frame is None:
+                break
+            frames.append(frame)
+        return frames
+
+    def enable_trace(self, sample_every=1, window=DEFAULT_TRACE_WINDOW):
+        """
+        开启按帧的时延采样统计
+        :param sample_every: 每隔多少帧采样一帧，1表示每帧都采样
+        :param window: 每个阶段保留最近多少个样本用于计算百分位
+        :return:
+        """
+        self._tracer = FrameTracer(sample_every, window)
+
+    def disable_trace(self):
+        """
+        关闭时延采样统计
+        :return:
+        """
+        self._tracer = None
+
+    def set_receive_mode(self, mode=RECEIVE_MODE_ALL, gop_step=1, min_interval=0.0):
+        """
+        设置接收模式，在解析RTP包之前丢弃不需要的数据
+        :param mode: 接收模式 ReceiveMode.ALL/REFERENCE/KEYFRAME
+        :param gop_step: 每gop_step个GOP保留一个
+        :param min_interval: 保留的两个GOP之间最小的间隔(秒)，按RTP时间戳计算，0表示不限制
+        :return:
+        """
+        if mode == RECEIVE_MODE_ALL and gop_step == 1 and not min_interval:
+            self._packet_filter = None
+        else:
+            from .receive_mode import PacketFilter
+            self._packet_filter = PacketFilter(mode, gop_step, min_interval)
+        logger.info('设置接收模式 mode:{} gop_step:{} min_interval:{}'.format(mode, gop_step, min_interval))
+
+    @property
+    def dropped_packets(self):
+        """
+        被接收模式丢弃的RTP包数量
+        :return:
+        """
+        packet_filter = self._packet_filter
+        return packet_filter.dropped_packets if packet_filter is not None else 0
+
+    def trace_stats(self, percentiles=DEFAULT_PERCENTILES):
+        """
+        获取各阶段时延的百分位统计
+        :param percentiles: 需要计算的百分位
+        :return: {阶段: {'count': 采样帧数, 'p50': 微秒, ...}}，没有开启采样时返回空字典
+        """
+        tracer = self._tracer
+        if tracer is None:
+            return {}
+        return tracer.stats(percentiles)
+
+    @property
+    def running(self):
+        """
+        接收线程是否还在运行
+        :return:
+        """
+        return not self._stop_event.is_set()
+
+    def _start_task(self, target, name):
+        """
+        启动一个可以被停止和回收的接收线程
+        :param target: 线程函数
+        :param name: 线程名称
+        :return:
+        """
+        task = threading.Thread(target=target, name='{}-{}'.format(name, self.rtsp_server_ip), daemon=True)
+        self._tasks.append(task)
+        task.start()
+
+    def _stop_tasks(self, timeout=THREAD_JOIN_TIMEOUT):
+        """
+        通知所有接收线程退出并等待线程结束，需要先关闭socket唤醒阻塞在recv上的线程
+        :param timeout: 等待所有线程退出的最长时间(秒)
+        :return:
+        """
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        current = threading.current_thread()
+        for task in self._tasks:
+            if task is current:
+                continue
+            task.join(max(0.0, deadline - time.monotonic()))
+            if task.is_alive():
+                logger.warning('接收线程 {} 没有在 {} 秒内退出'.format(task.name, timeout))
+        self._tasks = [task for task in self._tasks if task.is_alive()]
+        self._end_stream()
+
+    def _end_stream(self):
+        """
+        通知消费者视频流已经结束，只会推送一次结束标志
+        :return:
+        """
+        with self._stream_end_lock:
+            if self._stream_ended:
+                return
+            self._stream_ended = True
+        self._frame_queue.put(_STREAM_END)
+
+    @abc.abstractmethod
+    def _create(self):
+        """
+        如果需要的话在子类创建rtp的socket
+        :return:
+        """
+        pass
+
+    def _init_rtsp_session(self):
+        """
+        创建用于rtsp连接的的tcp链路
+        :return:初始化成功返回True 失败返回False
+        """
+        try:
+            self._rtsp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._rtsp_socket.connect((self.rtsp_server_ip, self.rtsp_server_port))
+            self._rtsp_socket.settimeout(SOCKET_TIMEOUT)
+            self._rtsp_session_connection_status = True
+            logger.info('初始化rtsp session connection 成功')
+            return True
+        except Exception as e:
+            logger.error('连接到RTSP服务器的tcp服务端失败 {}, ip:{}, port:{}'.format(e.args, self.rtsp_server_ip,
+                                                                      self.rtsp_server_port))
+            self._rtsp_session_connection_status = False
+            return False
+
+    def _release_rtsp_session(self):
+        """
+        释放rtsp的资源
+        :return:
+        """
+        try:
+            if self._rtsp_socket:
+                _shutdown_socket(self._rtsp_socket)
+                self._rtsp_socket.close()
+        except Exception as e:
+            logger.error('释放RTSP的socket资源失败 {}'.format(e.args))
+
+    def _start_rtsp_flow(self):
+        """
+        开启RTSP的交互流程
+        :return:
+        """
+        logger.info('开始RTSP的交互流程')
+        self._option()
+        self._describe()
+
+    @property
+    def rtsp_server_ip(self):
+        return self._rtsp_server_ip
+
+    @property
+    def rtsp_server_port(self):
+        return self._rtsp_server_port
+
+    @property
+    def url(self):
+        return self._url
+
+    @property
+    def session_id(self):
+        return self._rtsp_session_id
+
+    def _option(self):
+        """
+        获取rtsp支持的方法并解析
+        :return:
+        """
+        cmd = '{} {} RTSP/1.0 \r\n' \
+              'CSeq: {} \r\n' \
+              'User-Agent: Lavf57.83.100 \r\n\r\n'.format(RTSPCmd.OPTIONS, self.url, RTSPCSeq.OPTIONS).encode()
+        self._rtsp_socket.send(cmd)
+        logger.info('发送OPTION消息成功')
+
+    def _parse_option_response(self, data):
+        """
+        解析option的回复
+        :param data:
+        :return:
+        """
+        if '200 OK' in data:
+            logger.info(' RTSP 回复 OPTION 成功')
+        else:
+            logger.error('RTSP 回复 OPTION 失败')
+
+    def _describe(self):
+        """
+        获取视频流的属性并解析
+        :return:
+        """
+        cmd = '{} {} RTSP/1.0 \r\n' \
+              'CSeq: {} \r\n' \
+              'User-Agent: Lavf57.83.100 \r\n\r\n'.format(RTSPCmd.DESCRIBE, self.url, RTSPCSeq.DESCRIBE).encode()
+        self._rtsp_socket.send(cmd)
+        logger.info('发送DESCRIBE消息成功')
+
+    def _parse_describe_response(self, data):
+        """
+        解析订阅的回复
+        :param data:
+        :return:
+        """
+        if '200 OK' not in data:
+            logger.error('RTSP回复DESCRIBE失败')
+            return
+        if 'Session:' in data:
+            session_pattern = re.compile(r'Session: (.*)\r\n')
+            result = session_pattern.findall(data)
+            self._rtsp_session_id = result[0]
+        logger.info('RTSP回复DESCRIBE成功')
+        self._setup_video()
+
+    @abc.abstractmethod
+    def _setup_video(self):
+        """
+        建立和rtsp server视频的连接
+        :return:
+        """
+        pass
+
+    def _parse_setup_video_response(self, data):
+        """
+        解析setup视频的回复
+        :param data:
+        :return:
+        """
+        if '200 OK' not in data:
+            logger.error('SET VIDEO失败')
+            return
+        if 'timeout' in data and 'Session' in data:
+            session_pattern = re.compile(r'Session: (.*);timeout=(.*)\r\n')
+            result = session_pattern.findall(data)
+            self._rtsp_session_id = result[0][0]
+            self._rtsp_session_timeout = result[0][1]
+        else:
+            session_pattern = re.compile(r'Session: (.*)\r\n')
+            result = session_pattern.findall(data)
+            self._rtsp_session_id = result[0]
+        logger.info(result)
+        logger.info('RTSP回复SETUP成功 session id:{} timeout:{}'.format(self._rtsp_session_id, self._rtsp_session_timeout))
+        self._play()
+
+    @abc.abstractmethod
+    def _setup_audio(self):
+        """
+        建立和rtsp server音频的连接
+        :return:
+        """
+        cmd = '{} {} '
+
+    def _parse_setup_audio_response(self, data):
+        """
+        解析setup音频的回复
+        :param data:
+        :return:
+        """
+        pass
+
+    def _play(self):
+        """
+        播放视频流
+        :return:
+        """
+        cmd = '{} {} RTSP/1.0\r\n' \
+              'Range: npt=0.000-\r\n' \
+              'CSeq: {}\r\n' \
+              'User-Agent: Lavf57.83.100\r\n' \
+              'Session: {}\r\n\r\n'.format(RTSPCmd.PLAY, self.url, RTSPCSeq.PLAY, self._rtsp_session_id).encode()
+        self._rtsp_socket.send(cmd)
+        logger.info('发送PLAY消息成功')
+
+    def _parse_play_response(self, data):
+        """
+        解析播放的回复
+        :param data:
+        :return:
+        """
+        if '200 OK' not in data:
+            logger.error('RTSP 回复PLAY失败')
+            return
+        logger.info('RTSP回复PLAY成功，和RTSP服务器之间建立连接完成')
+
+    def _rtsp_response_parse(self, data):
+        """
+        解析rtsp的回复消息
+        :param data:
+        :return:
+        """
+        if not len(data):
+            return
+        if data.startswith('RTSP'):
+            pattern = re.compile(r'(?<=CSeq: )\d+\.?\d*')
+            communication_sequence = int(pattern.findall(data)[0])
+            self._cseq_function_map[communication_sequence](data)
+        elif data.startswith('ANNOUNCE'):
+            pass
+        else:
+            logger.warning('received {}'.format(data))
+
+    def _accept_rtp_packet(self, data, start=0, end=None):
+        """
+        根据接收模式判断RTP包是否需要，只读取RTP头和NAL头，不拷贝负载
+        :param data: 包含RTP包的缓冲区
+        :param start: RTP包在缓冲区中的起始位置
+        :param end: RTP包在缓冲区中的结束位置，None表示缓冲区末尾
+        :return: True保留 False丢弃
+        """
+        packet_filter = self._packet_filter
+        return packet_filter is None or packet_filter.accept(data, start, end)
+
+    def _handle_rtp_packet(self, complete_packet, recv_ns=0):
+        """
+        解析收到的RTP包并放入帧队列，开启采样时记录各阶段的时间戳
+        :param complete_packet: RTP包(bytes或者memoryview)，负载拷贝到帧池的缓冲区，返回后不再引用
+        :param recv_ns: 收到这个包的时间(time.monotonic_ns())，没有开启采样时为0
+        :return:
+        """
+        rtp_packet = self._rtp_packet_parse(complete_packet)
+        trace = None
+        tracer = self._tracer
+        if tracer is not None and recv_ns:
+            trace = tracer.on_packet(rtp_packet.timestamp, rtp_packet.marker, recv_ns)
+            if trace is not None:
+                trace.assembled_ns = time.monotonic_ns()
+        frame = self._frame_pool.acquire(frame_size(complete_packet, rtp_packet))
+        frame.fill(complete_packet, rtp_packet)
+        if trace is not None:
+            frame.trace = trace
+            # 放入队列之前打点，ENQUEUE阶段包含从帧池取帧和拷贝负载的耗时
+            trace.enqueued_ns = time.monotonic_ns()
+        self._frame_queue.put(frame)
+
+    def _rtp_packet_parse(self, complete_packet):
+        """
+        输入是一个完成的RTP的数据包，解析rtp完整的包，找到H264数据和扩展头的位置
+        :param complete_packet:RTP包
+        :return: 解析结果RtpPacket，每个客户端复用同一个对象
+        """
+        rtp_packet = self._rtp_packet
+        rtp_packet.extension_offset = 0
+        rtp_packet.extension_length = 0
+        first_byte = complete_packet[0]
+        "是否存在扩展头"
+        x = first_byte & 0x10
+        "固定头后面 CSRC 识别符的数目"
+        cc = first_byte & 0x0F
+        rtp_packet.marker = complete_packet[1] & 0x80
+        rtp_packet.timestamp = RTP_TIMESTAMP_STRUCT.unpack_from(complete_packet, 4)[0]
+        # 跳过固定头和CSRC列表
+        lc = RTP_FIXED_HEADER_LEN + 4 * cc
+
+        if x:
+            # 扩展头: 16bit的profile + 16bit的长度(以4字节为单位)
+            hlen = (complete_packet[lc + 2] << 8) | complete_packet[lc + 3]
+            lc += 4
+            # 扩展头的内容只记录位置，需要时再解析，曝光时间为NTP格式(秒, 秒的小数部分/2^32)
+            extension_offset = lc
+            extension_length = 4 * hlen
+            lc += extension_length
+        else:
+            extension_offset = extension_length = 0
+
+        # FU identifier: [F | NRI | Type]
+        fu_identifier = complete_packet[lc]
+        fu_identifier_fragment_type = fu_identifier & 0x1F
+        lc += 1
+
+        # FU header: [S | E | R | Type]
+        fu_header = complete_packet[lc]
+        fu_header_start_bit = fu_header & 0x80
+        fu_header_nal_unit_type = fu_header & 0x1F
+        lc += 1
+
+        if fu_identifier_fragment_type == RTPFragmentType.FU_A:  # This code only handles "Type" = 28, i.e. "FU-A"
+            if fu_header_nal_unit_type == NALUnitType.IDX:
+                self._i_received_flag = True
+            if not self._i_received_flag:
+                logger.info('not Param.get_i_frame')
+                rtp_packet.payload_offset = -1
+                return rtp_packet
+            if fu_header_start_bit:  # OK, this is a first fragment in a movie frame
+                # 重建NAL头 [F | NRI] + [Type]，并加上起始码
+                rtp_packet.prefix = FU_A_START_PREFIXES[(fu_identifier & 0xE0) | fu_header_nal_unit_type]
+                rtp_packet.extension_offset = extension_offset
+                rtp_packet.extension_length = extension_length
+            else:
+                rtp_packet.prefix = b''
+            rtp_packet.payload_offset = lc
+        elif fu_identifier_fragment_type <= RTPFragmentType.SINGLE_NAL_MAX:
+            rtp_packet.prefix = NAL_START_CODE_BYTES
+            rtp_packet.payload_offset = lc - 2
+        else:
+            logger.info('return None, None')
+            rtp_packet.payload_offset = -1
+        return rtp_packet
+
+
+def _shutdown_socket(sock):
+    """
+    关闭socket的读写，唤醒阻塞在recv上的线程，recv会立即返回空数据
+    :param sock: 需要关闭的socket
+    :return:
+    """
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        # 未连接的UDP socket会返回ENOTCONN，但是在Linux上依然会唤醒recv
+        pass
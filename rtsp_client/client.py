@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：client.py
+@Author  ：huangwenxi
+@Date    ：2022/4/26 9:57 
+'''
+import logging
+import sys
+import time
+from .tcp import RtspClientTcp
+from .udp import RtspClientUdp
+from .receive_mode import ReceiveMode
+from .trace import DEFAULT_TRACE_WINDOW, DEFAULT_PERCENTILES
+logger = logging.getLogger(__name__)
+
+
+class RTPProtocol:
+    RTP_OVER_TCP = 1
+    RTP_OVER_UDP = 2
+
+
+class RtspClient:
+    def __init__(self, rtp_protocol, rtsp_url, video_name='test.h264', timestamp_name='test.timestamp'):
+        # rtp承载的协议类型
+        self._rtp_protocol = rtp_protocol
+        self._rtsp_url = rtsp_url
+        # 从url中解析ip和端口号
+        self._ip = rtsp_url.split('//')[1].split('/')[0].split(':')[0]
+        self._port = int(rtsp_url.split('//')[1].split('/')[0].split(':')[1])
+        logger.info('从URL解析得到ip:{} port:{}'.format(self._ip, self._port))
+        # 根据rtp承载的协议创建指定的RTSP客户端对象
+        if rtp_protocol == RTPProtocol.RTP_OVER_UDP:
+            self._rtsp_client = RtspClientUdp(self._ip, self._port, self._rtsp_url)
+        elif rtp_protocol == RTPProtocol.RTP_OVER_TCP:
+            self._rtsp_client = RtspClientTcp(self._ip, self._port, self._rtsp_url)
+        else:
+            logger.error('RTP协议初始化失败')
+        # 测试录制的视频和时间戳，第一次写入时才创建文件
+        self._video_name = video_name
+        self._timestamp_name = timestamp_name
+        self._recorder = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+        return False
+
+    def connect(self):
+        """
+        连接到RTSP server
+        :return:True成功 False失败
+        """
+        return self._rtsp_client.connect()
+
+    def disconnect(self):
+        """
+        释放资源
+        :return:
+        """
+        try:
+            self._rtsp_client.disconnect()
+            if self._recorder:
+                self._recorder.close()
+                self._recorder = None
+        except Exception as e:
+            logger.error('释放资源失败 :{}'.format(e.args))
+
+    def read_frame(self, timeout=None):
+        """
+        读取视频帧和曝光时间戳
+        :param timeout: 等待数据的最长时间(秒)，None表示一直等待，超时抛出queue.Empty
+        :return: 视频流数据Frame，可以解包成[视频帧，曝光时间]，用完后调用release()复用缓冲区；
+                 连接断开或者出错后返回None
+        """
+        return self._rtsp_client.read_frame(timeout)
+
+    def read_frames(self, count, timeout=None):
+        """
+        批量读取视频帧，可以配合timestamps.exposure_timestamps批量解析其中带扩展头的帧的曝光时间
+        :param count: 读取的帧数
+        :param timeout: 等待每一帧的最长时间(秒)，None表示一直等待，超时抛出queue.Empty
+        :return: Frame列表，连接断开时返回已经读到的帧
+        """
+        return self._rtsp_client.read_frames(count, timeout)
+
+    def set_receive_mode(self, mode=ReceiveMode.ALL, gop_step=1, min_interval=0.0):
+        """
+        设置接收模式，在解析RTP包之前丢弃不需要的数据
+        :param mode: 接收模式 ReceiveMode.ALL/REFERENCE/KEYFRAME
+        :param gop_step: 每gop_step个GOP保留一个
+        :param min_interval: 保留的两个GOP之间最小的间隔(秒)，按RTP时间戳计算，0表示不限制
+        :return:
+        """
+        self._rtsp_client.set_receive_mode(mode, gop_step, min_interval)
+
+    def enable_trace(self, sample_every=1, window=DEFAULT_TRACE_WINDOW):
+        """
+        开启按帧的时延采样统计
+        :param sample_every: 每隔多少帧采样一帧，1表示每帧都采样
+        :param window: 每个阶段保留最近多少个样本用于计算百分位
+        :return:
+        """
+        self._rtsp_client.enable_trace(sample_every, window)
+
+    def disable_trace(self):
+        """
+        关闭时延采样统计
+        :return:
+        """
+        self._rtsp_client.disable_trace()
+
+    def trace_stats(self, percentiles=DEFAULT_PERCENTILES):
+        """
+        获取各阶段时延的百分位统计
+        :param percentiles: 需要计算的百分位
+        :return: {阶段: {'count': 采样帧数, 'p50': 微秒, ...}}
+        """
+        return self._rtsp_client.trace_stats(percentiles)
+
+    def write_h264(self, frame):
+        self._get_recorder().write_h264(frame)
+
+    def write_snap_timestamp(self, timestamp):
+        self._get_recorder().write_snap_timestamp(timestamp)
+
+    def _get_recorder(self):
+        """
+        按需创建录制对象，只收流不录制的时候不会创建任何文件
+        :return: 录制对象
+        """
+        if self._recorder is None:
+            from .recorder import H264Recorder
+            self._recorder = H264Recorder(self._video_name, self._timestamp_name)
+        return self._recorder
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 2:
+        print('usage: python -m rtsp_client.client rtsp://ip:port/path')
+        sys.exit(-1)
+    url = sys.argv[1]
+    time_start = time.time()
+    try:
+        with RtspClient(RTPProtocol.RTP_OVER_TCP, url) as rtsp_client:
+            if not rtsp_client.connect():
+                logger.error('连接RTSP服务器失败')
+                sys.exit(-1)
+            while time.time() < time_start + 10:
+                frame = rtsp_client.read_frame()
+                if frame is None:
+                    break
+                with frame:
+                    if not frame.data:
+                        continue
+                    logger.info('读取 {} 字节的数据 扩展头:{}'.format(len(frame.data), frame.extension))
+                    rtsp_client.write_h264(frame.data)
+    except Exception as e:
+        logger.error(e.args)
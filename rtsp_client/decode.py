@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：decode.py
+'''
+import logging
+from ._optional import import_optional
+logger = logging.getLogger(__name__)
+
+
+def iter_decoded_frames(video_name):
+    """
+    解码录制的H264文件，逐帧返回图像
+    :param video_name: H264文件路径
+    :return: 解码后的图像(numpy数组)
+    """
+    cv2 = import_optional('cv2', 'opencv-python', '解码H264文件')
+    capture = cv2.VideoCapture(video_name)
+    if not capture.isOpened():
+        logger.error('打开视频文件失败 {}'.format(video_name))
+        return
+    try:
+        while True:
+            ret, image = capture.read()
+            if not ret:
+                break
+            yield image
+    finally:
+        capture.release()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：frame.py
+'''
+import collections
+import struct
+import threading
+
+# 帧池的缓冲区大小等级: 每个2的幂区间再四等分，按等级分配的浪费不超过25%
+MIN_POOLED_BUFFER_SIZE = 64
+# 大于最大等级(TCP交织包的最大长度 + 起始码和NAL头)的缓冲区不回收
+MAX_POOLED_BUFFER_SIZE = 128 * 1024
+DEFAULT_MAX_POOLED_FRAMES = 64
+
+
+class RtpPacket:
+    """
+    RTP包解析结果，每个客户端复用同一个对象，只在接收线程中使用
+    payload_offset为-1表示这个包没有需要输出的视频数据
+    """
+    __slots__ = ('marker', 'timestamp', 'prefix', 'payload_offset', 'extension_offset', 'extension_length')
+
+    def __init__(self):
+        self.marker = 0
+        self.timestamp = 0
+        # 需要加在负载前面的起始码和NAL头
+        self.prefix = b''
+        self.payload_offset = -1
+        self.extension_offset = 0
+        self.extension_length = 0
+
+
+class Frame:
+    """
+    read_frame返回的视频数据，数据保存在帧池的缓冲区中
+    使用完之后调用release()把缓冲区还给帧池，release之后不能再访问data和extension_raw
+    为了兼容以前的接口，可以用 data, rtp_extension = frame 的方式解包
+    """
+    __slots__ = ('_pool', '_buffer', '_length', '_extension_length', '_in_pool', 'rtp_timestamp', 'marker', 'trace')
+
+    def __init__(self, pool, buffer_size):
+        self._pool = pool
+        self._buffer = bytearray(buffer_size)
+        self._length = -1
+        self._extension_length = 0
+        self._in_pool = False
+        self.rtp_timestamp = 0
+        self.marker = 0
+        self.trace = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+    def __iter__(self):
+        yield self.data
+        yield self.extension
+
+    def __getitem__(self, index):
+        return (self.data, self.extension)[index]
+
+    @property
+    def capacity(self):
+        """
+        缓冲区的大小
+        :return:
+        """
+        return len(self._buffer)
+
+    @property
+    def data(self):
+        """
+        视频数据(起始码 + NAL数据)，没有有效数据时为None
+        :return: memoryview
+        """
+        if self._length < 0:
+            return None
+        return memoryview(self._buffer)[:self._length]
+
+    @property
+    def extension_raw(self):
+        """
+        RTP扩展头的原始数据(网络字节序的4字节字)，没有扩展头时为None
+        :return: memoryview
+        """
+        if not self._extension_length:
+            return None
+        return memoryview(self._buffer)[self._length:self._length + self._extension_length]
+
+    @property
+    def extension(self):
+        """
+        RTP扩展头解析成的整数列表，和以前read_frame返回的扩展头一致
+        :return:
+        """
+        if not self._extension_length:
+            return []
+        return list(struct.unpack_from('!{}I'.format(self._extension_length // 4), self._buffer, self._length))
+
+    def fill(self, complete_packet, rtp_packet):
+        """
+        把RTP包的负载和扩展头拷贝到缓冲区，缓冲区由FramePool.acquire按frame_size(rtp_packet)分配
+        :param complete_packet: RTP包(bytes或者memoryview)
+        :param rtp_packet: 这个包的解析结果RtpPacket
+        :return:
+        """
+        self.rtp_timestamp = rtp_packet.timestamp
+        self.marker = rtp_packet.marker
+        self.trace = None
+        payload_offset = rtp_packet.payload_offset
+        if payload_offset < 0:
+            self._length = -1
+            self._extension_length = 0
+            return
+        prefix = rtp_packet.prefix
+        prefix_length = len(prefix)
+        extension_length = rtp_packet.extension_length
+        length = prefix_length + len(complete_packet) - payload_offset
+        if length + extension_length > len(self._buffer):
+            self._buffer = bytearray(length + extension_length)
+        buffer = self._buffer
+        packet_view = memoryview(complete_packet)
+        buffer[:prefix_length] = prefix
+        buffer[prefix_length:length] = packet_view[payload_offset:]
+        if extension_length:
+            extension_offset = rtp_packet.extension_offset
+            buffer[length:length + extension_length] = packet_view[extension_offset:extension_offset + extension_length]
+        self._length = length
+        self._extension_length = extension_length
+
+    def release(self):
+        """
+        把缓冲区还给帧池，可以重复调用
+        :return:
+        """
+        self._pool.release(self)
+
+
+def frame_size(complete_packet, rtp_packet):
+    """
+    计算RTP包输出的视频数据和扩展头需要的缓冲区大小
+    :param complete_packet: RTP包
+    :param rtp_packet: 这个包的解析结果RtpPacket
+    :return:
+    """
+    if rtp_packet.payload_offset < 0:
+        return 0
+    return len(rtp_packet.prefix) + len(complete_packet) - rtp_packet.payload_offset + rtp_packet.extension_length
+
+
+def size_class(size):
+    """
+    计算缓冲区大小所属的等级，返回该等级的缓冲区大小
+    (2^(n-1), 2^n]区间按2^(n-3)的步长划分，例如1400字节属于1536字节的等级
+    :param size: 需要的缓冲区大小
+    :return: 不小于size的等级大小
+    """
+    if size <= MIN_POOLED_BUFFER_SIZE:
+        return MIN_POOLED_BUFFER_SIZE
+    step = 1 << ((size - 1).bit_length() - 3)
+    return (size + step - 1) // step * step
+
+
+class FramePool:
+    """
+    可复用的帧对象池，按缓冲区大小等级分别保存空闲的帧
+    消费者从来没有调用过release时按实际大小分配，内存占用和直接创建bytes相当；
+    开始回收之后按等级大小分配，保证同样大小的包可以复用回收的帧
+    """
+    def __init__(self, max_frames=DEFAULT_MAX_POOLED_FRAMES):
+        self._max_frames = max_frames
+        # {等级大小: 空闲的帧}
+        self._free = {}
+        self._recycling = False
+        # 接收线程取帧和消费者线程还帧需要保证_in_pool状态的切换是原子的
+        self._lock = threading.Lock()
+
+    @property
+    def free_count(self):
+        return sum(len(free) for free in self._free.values())
+
+    def acquire(self, size):
+        """
+        获取一个缓冲区至少为size字节的帧
+        :param size: 需要的缓冲区大小
+        :return: Frame
+        """
+        capacity = size_class(size)
+        free = self._free.get(capacity)
+        if free:
+            with self._lock:
+                if free:
+                    frame = free.pop()
+                    frame._in_pool = False
+                    return frame
+        return Frame(self, capacity if self._recycling else size)
+
+    def release(self, frame):
+        """
+        回收帧，重复回收、帧池已满或者缓冲区大小不在回收范围内时直接丢弃
+        :param frame:
+        :return:
+        """
+        capacity = len(frame._buffer)
+        with self._lock:
+            if frame._in_pool:
+                return
+            frame._in_pool = True
+            frame.trace = None
+            self._recycling = True
+            if capacity > MAX_POOLED_BUFFER_SIZE or size_class(capacity) != capacity:
+                return
+            free = self._free.get(capacity)
+            if free is None:
+                free = self._free[capacity] = collections.deque()
+            if len(free) < self._max_frames:
+                free.append(frame)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：multicast.py
+'''
+import logging
+import socket
+import struct
+import sys
+import threading
+import time
+from .base import MAX_BUFFER_LEN, SOCKET_TIMEOUT, THREAD_JOIN_TIMEOUT, _shutdown_socket
+logger = logging.getLogger(__name__)
+MULTICAST_RCVBUF = 1024 * 1024
+
+
+class MulticastGroup:
+    """
+    一个组播组(地址+端口+本地网卡)在进程内只创建一个socket和一个接收线程，
+    收到的RTP包分发给所有订阅了这个组的客户端
+    """
+    _groups = {}
+    _groups_lock = threading.Lock()
+
+    def __init__(self, group, port, interface):
+        self._group = group
+        self._port = port
+        self._interface = interface
+        self._subscribers = ()
+        self._stop_event = threading.Event()
+        self._closed = False
+        self._socket = self._open_socket()
+        self._task = threading.Thread(target=self._recv_task, name='rtp-multicast-{}:{}'.format(group, port),
+                                      daemon=True)
+        self._task.start()
+
+    @classmethod
+    def subscribe(cls, group, port, callback, interface='0.0.0.0', error_callback=None):
+        """
+        订阅组播组，第一个订阅者会创建socket并加入组播
+        :param group: 组播地址
+        :param port: 组播端口
+        :param callback: 收到RTP包时的回调 callback(packet, recv_ns)，在组播接收线程中调用，
+                         packet是指向接收缓冲区的memoryview，回调返回后不能再引用
+        :param interface: 加入组播使用的本地网卡地址
+        :param error_callback: 组播接收线程异常退出时的回调 error_callback()
+        :return: 组播组对象，用于取消订阅
+        """
+        key = (group, port, interface)
+        with cls._groups_lock:
+            multicast_group = cls._groups.get(key)
+            if multicast_group is None:
+                multicast_group = cls(group, port, interface)
+                cls._groups[key] = multicast_group
+                logger.info('加入组播组成功 group:{} port:{} interface:{}'.format(group, port, interface))
+            multicast_group._subscribers = multicast_group._subscribers + ((callback, error_callback),)
+        return multicast_group
+
+    def unsubscribe(self, callback, timeout=THREAD_JOIN_TIMEOUT):
+        """
+        取消订阅，最后一个订阅者离开时退出组播并回收接收线程
+        :param callback: 订阅时传入的回调
+        :param timeout: 等待接收线程退出的最长时间(秒)
+        :return:
+        """
+        with self._groups_lock:
+            self._subscribers = tuple(subscriber for subscriber in self._subscribers if subscriber[0] != callback)
+            if self._subscribers:
+                return
+            self._unregister()
+        self._close(timeout)
+
+    @property
+    def group(self):
+        return self._group
+
+    @property
+    def port(self):
+        return self._port
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def _open_socket(self):
+        """
+        创建接收组播的socket并加入组播组
+        :return:
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
+            if hasattr(socket, 'SO_REUSEPORT'):
+                # 允许其他进程也接收同一个组播组
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, True)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MULTICAST_RCVBUF)
+            # 绑定组播地址只接收这个组的数据，Windows不支持绑定组播地址
+            sock.bind(('' if sys.platform == 'win32' else self._group, self._port))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, self._membership())
+            sock.settimeout(SOCKET_TIMEOUT)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def _unregister(self):
+        """
+        从进程内的组播组表中移除，调用时需要持有_groups_lock
+        :return:
+        """
+        key = (self._group, self._port, self._interface)
+        if self._groups.get(key) is self:
+            del self._groups[key]
+
+    def _membership(self):
+        return struct.pack('4s4s', socket.inet_aton(self._group), socket.inet_aton(self._interface))
+
+    def _close(self, timeout):
+        """
+        退出组播组并释放socket
+        :param timeout: 等待接收线程退出的最长时间(秒)
+        :return:
+        """
+        self._stop_event.set()
+        with self._groups_lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self._socket.setsockopt(socket.IPPROTO_IP, socket.IP_DROP_MEMBERSHIP, self._membership())
+        except OSError as e:
+            logger.warning('退出组播组失败 {}'.format(e.args))
+        _shutdown_socket(self._socket)
+        self._socket.close()
+        if self._task is not threading.current_thread():
+            self._task.join(timeout)
+        logger.info('退出组播组 group:{} port:{}'.format(self._group, self._port))
+
+    def _recv_task(self):
+        """
+        接收组播的RTP包并分发给所有订阅者
+        :return:
+        """
+        try:
+            # 所有订阅者在回调中同步拷贝负载，接收缓冲区可以复用
+            recv_buffer = bytearray(MAX_BUFFER_LEN)
+            recv_view = memoryview(recv_buffer)
+            while not self._stop_event.is_set():
+                try:
+                    length = self._socket.recv_into(recv_buffer)
+                except socket.timeout:
+                    continue
+                if not length:
+                    continue
+                recv_ns = time.monotonic_ns()
+                data = recv_view[:length]
+                for callback, _ in self._subscribers:
+                    try:
+                        callback(data, recv_ns)
+                    except Exception as e:
+                        logger.error('处理组播RTP包出错:{}'.format(e.args))
+        except Exception as e:
+            if not self._stop_event.is_set():
+                logger.error('组播接收线程出错:{}'.format(e.args))
+                # 接收线程异常退出后，后续的订阅会重新创建socket
+                with self._groups_lock:
+                    self._unregister()
+                # 立即退出组播组并关闭socket，不依赖订阅者调用disconnect
+                self._close(0)
+                # 通知已经订阅的客户端，避免消费者一直阻塞在read_frame
+                for _, error_callback in self._subscribers:
+                    if error_callback is None:
+                        continue
+                    try:
+                        error_callback()
+                    except Exception as callback_error:
+                        logger.error('通知组播订阅者出错:{}'.format(callback_error.args))
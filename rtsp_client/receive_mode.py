@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：receive_mode.py
+'''
+from .base import RECEIVE_MODE_ALL, RTP_FIXED_HEADER_LEN, RTPFragmentType, NALUnitType
+
+RTP_CLOCK_RATE = 90000
+RTP_TIMESTAMP_MASK = 0xFFFFFFFF
+STAP_A = 24
+
+
+class ReceiveMode:
+    # 接收所有数据
+    ALL = RECEIVE_MODE_ALL
+    # 丢弃NRI为0的非参考数据
+    REFERENCE = 1
+    # 只保留SPS/PPS/IDR
+    KEYFRAME = 2
+
+
+class PacketFilter:
+    """
+    只根据RTP头和NAL/FU头判断一个RTP包是否需要，在解析和拷贝负载之前丢弃不需要的包
+    GOP从SPS或者IDR开始，抽帧以GOP为单位，保证保留下来的数据可以独立解码
+    """
+    def __init__(self, mode=ReceiveMode.ALL, gop_step=1, min_interval=0.0, clock_rate=RTP_CLOCK_RATE):
+        """
+        :param mode: 接收模式 ReceiveMode
+        :param gop_step: 每gop_step个GOP保留一个
+        :param min_interval: 保留的两个GOP之间最小的间隔(秒)，按RTP时间戳计算，0表示不限制
+        :param clock_rate: RTP时间戳的时钟频率，H264为90000
+        """
+        if gop_step < 1:
+            raise ValueError('gop_step必须大于等于1')
+        if min_interval < 0:
+            raise ValueError('min_interval不能小于0')
+        self._mode = mode
+        self._gop_step = gop_step
+        self._min_interval_ticks = int(min_interval * clock_rate)
+        self._decimate = gop_step > 1 or self._min_interval_ticks > 0
+        self._gop_timestamp = None
+        self._gop_index = -1
+        self._gop_keep = False
+        self._last_kept_timestamp = None
+        self._dropped_packets = 0
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def dropped_packets(self):
+        return self._dropped_packets
+
+    def accept(self, data, start=0, end=None):
+        """
+        判断RTP包是否需要保留
+        :param data: 包含RTP包的缓冲区
+        :param start: RTP包在缓冲区中的起始位置
+        :param end: RTP包在缓冲区中的结束位置，None表示缓冲区末尾
+        :return: True保留 False丢弃
+        """
+        if end is None:
+            end = len(data)
+        if start + RTP_FIXED_HEADER_LEN > end:
+            # 长度不够一个RTP头(包括TCP交织模式下长度为0的包)
+            self._dropped_packets += 1
+            return False
+        first_byte = data[start]
+        offset = start + RTP_FIXED_HEADER_LEN + 4 * (first_byte & 0x0F)
+        if first_byte & 0x10 and offset + 4 <= end:
+            offset += 4 + 4 * ((data[offset + 2] << 8) | data[offset + 3])
+        if offset >= end:
+            self._dropped_packets += 1
+            return False
+        nal_header = data[offset]
+        nal_unit_type = nal_header & 0x1F
+        if nal_unit_type == RTPFragmentType.FU_A and offset + 1 < end:
+            nal_unit_type = data[offset + 1] & 0x1F
+        elif nal_unit_type == STAP_A and offset + 3 < end:
+            # 聚合包按第一个NAL单元分类，通常是SPS/PPS
+            nal_unit_type = data[offset + 3] & 0x1F
+
+        if self._decimate:
+            if nal_unit_type == NALUnitType.SPS or nal_unit_type == NALUnitType.IDX:
+                timestamp = (data[start + 4] << 24) | (data[start + 5] << 16) | (data[start + 6] << 8) | data[start + 7]
+                if timestamp != self._gop_timestamp:
+                    self._start_gop(timestamp)
+            if not self._gop_keep:
+                self._dropped_packets += 1
+                return False
+
+        if self._mode == ReceiveMode.KEYFRAME:
+            keep = nal_unit_type == NALUnitType.IDX or nal_unit_type == NALUnitType.SPS or \
+                nal_unit_type == NALUnitType.PPS
+        elif self._mode == ReceiveMode.REFERENCE:
+            keep = nal_header & 0x60 != 0
+        else:
+            keep = True
+        if not keep:
+            self._dropped_packets += 1
+        return keep
+
+    def _start_gop(self, timestamp):
+        """
+        收到新GOP的第一个包时决定是否保留这个GOP
+        :param timestamp: GOP第一帧的RTP时间戳
+        :return:
+        """
+        self._gop_timestamp = timestamp
+        self._gop_index += 1
+        keep = self._gop_index % self._gop_step == 0
+        if keep and self._min_interval_ticks and self._last_kept_timestamp is not None:
+            elapsed = (timestamp - self._last_kept_timestamp) & RTP_TIMESTAMP_MASK
+            keep = elapsed >= self._min_interval_ticks
+        if keep:
+            self._last_kept_timestamp = timestamp
+        self._gop_keep = keep
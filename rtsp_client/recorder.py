@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：recorder.py
+'''
+import logging
+import os
+logger = logging.getLogger(__name__)
+
+
+class H264Recorder:
+    """
+    把视频流数据和曝光时间戳写到本地文件，只有在需要录制的时候才会创建
+    """
+    def __init__(self, video_name='test.h264', timestamp_name='test.timestamp'):
+        self._video_name = video_name
+        if os.path.exists(self._video_name):
+            os.remove(self._video_name)
+        self._video_fd = open(self._video_name, 'wb')
+
+        self._timestamp_name = timestamp_name
+        if os.path.exists(self._timestamp_name):
+            os.remove(self._timestamp_name)
+        self._timestamp_fd = open(self._timestamp_name, 'w')
+        logger.info('创建录制文件成功 video:{} timestamp:{}'.format(self._video_name, self._timestamp_name))
+
+    @property
+    def video_name(self):
+        return self._video_name
+
+    @property
+    def timestamp_name(self):
+        return self._timestamp_name
+
+    def write_h264(self, frame):
+        self._video_fd.write(frame)
+
+    def write_snap_timestamp(self, timestamp):
+        self._timestamp_fd.writelines('{} \n'.format(timestamp))
+
+    def close(self):
+        """
+        关闭录制文件
+        :return:
+        """
+        self._video_fd.close()
+        self._timestamp_fd.close()
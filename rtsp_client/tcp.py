@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：tcp.py
+@Author  ：huangwenxi
+@Date    ：2022/4/25 10:04 
+'''
+import logging
+import socket
+import time
+from .base import RtspClientBase, RTSPCmd, RTSPCSeq, THREAD_JOIN_TIMEOUT
+logger = logging.getLogger(__name__)
+MAX_BUFFER_LEN = 10240
+
+
+class RtspClientTcp(RtspClientBase):
+    def __init__(self, rtsp_server_ip, rtsp_server_port, url):
+        RtspClientBase.__init__(self, rtsp_server_ip, rtsp_server_port, url)
+        self._rtsp_data_buffer = b''
+
+    def connect(self):
+        """
+        连接到RTSP server并启动解析程序
+        :return:True 成功 False失败
+        """
+        if not super(RtspClientTcp, self).connect():
+            logger.error('创建socket资源失败')
+            return False
+        self._start_task(self._rtsp_rtp_msg_parse_task, 'rtsp-tcp')
+        return True
+
+    def _create(self):
+        """
+        创建rtp和rtcp的服务端
+        :return:
+        """
+        self._rtp_socket = self._rtsp_socket
+        self._rtsp_data_buffer = b''
+        return True
+
+    def disconnect(self, timeout=THREAD_JOIN_TIMEOUT):
+        """
+        释放创建的socket资源，停止并回收接收线程
+        :param timeout: 等待接收线程退出的最长时间(秒)
+        :return:
+        """
+        self._stop_event.set()
+        self._release_rtsp_session()
+        self._stop_tasks(timeout)
+
+    def _setup_audio(self):
+        """
+        和rtsp服务器建立音频的连接
+        :return:
+        """
+        pass
+
+    def _setup_video(self):
+        """
+        和rtsp服务器建立视频的连接
+        :return:
+        """
+        cmd = '{} {}/trackID=1 RTSP/1.0 \r\n' \
+              'Transport: RTP/AVP/TCP;unicast;interleaved=0-1 \r\n' \
+              'CSeq: {} \r\n' \
+              'User-Agent: Lavf57.83.100 \r\n' \
+              'Session: {} \r\n\r\n'.format(RTSPCmd.SETUP, self.url,
+                                            RTSPCSeq.SETUP_VIDEO, self._rtsp_session_id).encode()
+        self._rtsp_socket.send(cmd)
+        logger.info('发送SETUP视频消息成功')
+
+    def _rtsp_rtp_msg_parse_task(self):
+        """
+        解析rtsp和rtp的消息
+        :return:
+        """
+        logger.info('开始运行RTSP消息解析任务')
+        self._start_rtsp_flow()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data = self._rtsp_socket.recv(MAX_BUFFER_LEN)
+                except socket.timeout:
+                    continue
+                if not len(data):
+                    if not self._stop_event.is_set():
+                        logger.warning('RTSP服务器关闭了连接')
+                    break
+                recv_ns = time.monotonic_ns() if self._tracer is not None else 0
+                logger.debug('从socket收到 %s 字节的数据', len(data))
+                result = self._split_rtsp_rtp(data)
+                for packet_type, packet in result:
+                    if packet_type == 'RTSP':
+                        logger.info(packet[0])
+                        packet = packet.decode()
+                        self._rtsp_response_parse(packet)
+                    elif packet_type == 'RTP':
+                        self._handle_rtp_packet(packet, recv_ns)
+                    else:
+                        logger.warn('无有效数据包')
+        except Exception as e:
+            if not self._stop_event.is_set():
+                logger.error('RTSP消息接收线程出错:{}'.format(e.args))
+        finally:
+            self._stop_event.set()
+            self._end_stream()
+            logger.info('RTSP消息解析任务退出')
+
+    def _split_rtsp_rtp(self, data):
+        """
+        把TCP流切分成RTSP消息和RTP包，RTP包以memoryview的形式返回，不拷贝负载；
+        接收模式不需要的RTP包在切分时直接丢弃
+        :param data: 新收到的数据
+        :return: [[类型, 数据包], ...]
+        """
+        buffer = self._rtsp_data_buffer + data if self._rtsp_data_buffer else data
+        buffer_view = memoryview(buffer)
+        size = len(buffer)
+        pos = 0
+        result = []
+        try:
+            while size - pos >= 4:
+                if buffer[pos] == 36:
+                    channel = buffer[pos + 1]
+                    length = (buffer[pos + 2] << 8) | buffer[pos + 3]
+                    end = pos + 4 + length
+                    if size < end:
+                        logger.debug('当前RTP包不完整，等待更多数据')
+                        break
+                    if channel == 0:
+                        logger.debug('当前数据属于RTP数据,长度:%s', length)
+                        if self._accept_rtp_packet(buffer, pos + 4, end):
+                            # bytes不可变，切片视图在缓冲区被替换之后依然有效
+                            result.append(['RTP', buffer_view[pos + 4:end]])
+                    else:
+                        logger.debug('当前数据输入RTCP数据, %s 长度:%s', channel, length)
+                    pos = end
+                else:
+                    logger.info('当前数据是RTSP数据,长度:{}'.format(len(data)))
+                    pos = size
+                    result.append(['RTSP', data])
+                    break
+            # 只在处理完整个缓冲区之后保留剩余的不完整数据，避免每个包都拷贝一次缓冲区
+            self._rtsp_data_buffer = buffer[pos:] if pos < size else b''
+            return result
+        except Exception as e:
+            logger.error('分割rtsp和rtp消息出错{}'.format(e.args))
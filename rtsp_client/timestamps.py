@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：timestamps.py
+'''
+from ._optional import import_optional
+
+# NTP时间(1900-01-01)和Unix时间(1970-01-01)的秒数差
+NTP_UNIX_EPOCH_OFFSET = 2208988800
+NTP_FRACTION_SCALE = 2.0 ** 32
+NTP_TIMESTAMP_LEN = 8
+
+
+def exposure_timestamps(frames, word_index=0):
+    """
+    批量解析帧的曝光时间戳，扩展头中从word_index开始的两个字是NTP格式的曝光时间(秒, 秒的小数部分/2^32)
+    每个Frame对应一个RTP包，通常只有一帧图像的第一个包(FU-A起始分片)带扩展头，所以只返回带扩展头的帧
+    扩展头按帧逐个拼接成一个缓冲区，NTP到Unix时间的换算由numpy对整个数组完成
+    :param frames: read_frame/read_frames返回的帧列表
+    :param word_index: 曝光时间在扩展头中的位置(以4字节为单位)
+    :return: (indices, timestamps) indices是带曝光时间的帧在frames中的下标(numpy.intp数组)，
+             timestamps是对应的曝光时间(numpy.float64数组，单位是秒，Unix时间)
+    """
+    numpy = import_optional('numpy', 'numpy', '批量解析曝光时间戳')
+    start = 4 * word_index
+    end = start + NTP_TIMESTAMP_LEN
+    indices = []
+    raw = []
+    for index, frame in enumerate(frames):
+        extension_raw = frame.extension_raw
+        if extension_raw is not None and len(extension_raw) >= end:
+            indices.append(index)
+            raw.append(extension_raw[start:end])
+    words = numpy.frombuffer(b''.join(raw), dtype='>u4').reshape(len(indices), 2)
+    timestamps = words[:, 0] - float(NTP_UNIX_EPOCH_OFFSET) + words[:, 1] / NTP_FRACTION_SCALE
+    return numpy.array(indices, dtype=numpy.intp), timestamps
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：trace.py
+'''
+import collections
+import math
+import threading
+
+DEFAULT_TRACE_WINDOW = 1024
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class TraceStage:
+    # 第一个包到达到最后一个包(marker)到达，网络传输和分片的耗时
+    NETWORK = 'network'
+    # 最后一个包到达到解析完成
+    ASSEMBLE = 'assemble'
+    # 解析完成到放入帧队列，包括从帧池取帧和拷贝负载
+    ENQUEUE = 'enqueue'
+    # 在帧队列中等待消费者读取的时间
+    QUEUE = 'queue'
+    # 第一个包到达到read_frame返回
+    TOTAL = 'total'
+    ALL = (NETWORK, ASSEMBLE, ENQUEUE, QUEUE, TOTAL)
+
+
+class FrameTrace:
+    """
+    一帧数据在各个阶段的时间戳，单位是time.monotonic_ns()的纳秒
+    """
+    __slots__ = ('rtp_timestamp', 'first_recv_ns', 'last_recv_ns', 'assembled_ns', 'enqueued_ns', 'dequeued_ns')
+
+    def __init__(self, rtp_timestamp, first_recv_ns):
+        self.rtp_timestamp = rtp_timestamp
+        self.first_recv_ns = first_recv_ns
+        self.last_recv_ns = 0
+        self.assembled_ns = 0
+        self.enqueued_ns = 0
+        self.dequeued_ns = 0
+
+
+class RollingPercentile:
+    """
+    保存最近window个原始样本的滚动百分位统计，不是分桶直方图
+    写入是O(1)，每次读取统计结果时对窗口内的样本排序，默认窗口1024个样本，只适合低频的查询
+    """
+    def __init__(self, window=DEFAULT_TRACE_WINDOW):
+        self._samples = collections.deque(maxlen=window)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, value):
+        with self._lock:
+            self._samples.append(value)
+            self._count += 1
+
+    @property
+    def count(self):
+        """
+        累计写入的样本数量，不受窗口大小限制
+        :return:
+        """
+        return self._count
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES):
+        """
+        计算窗口内样本的百分位数(最近秩法: 第ceil(p/100*N)小的样本)
+        :param percentiles: 需要计算的百分位，例如(50, 90, 99)
+        :return: {百分位: 数值}，窗口为空时返回空字典
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {}
+        size = len(samples)
+        return {p: samples[min(size, max(1, math.ceil(p * size / 100.0))) - 1] for p in percentiles}
+
+
+class FrameTracer:
+    """
+    按帧采样记录从收到第一个RTP包到read_frame返回的各阶段耗时
+    一帧由RTP时间戳相同的一组包组成，marker位表示一帧的最后一个包
+    """
+    def __init__(self, sample_every=1, window=DEFAULT_TRACE_WINDOW):
+        if sample_every < 1:
+            raise ValueError('sample_every必须大于等于1')
+        self._sample_every = sample_every
+        self._frame_index = -1
+        self._current_rtp_timestamp = None
+        self._current_trace = None
+        self._histograms = {stage: RollingPercentile(window) for stage in TraceStage.ALL}
+
+    @property
+    def sample_every(self):
+        return self._sample_every
+
+    def on_packet(self, rtp_timestamp, marker, recv_ns):
+        """
+        接收线程每收到一个RTP包调用一次，时间戳和marker位由RTP解析结果传入，不再重复解析RTP头
+        :param rtp_timestamp: RTP时间戳
+        :param marker: RTP头的marker位
+        :param recv_ns: 收到这个包的时间
+        :return: 被采样的帧在收到最后一个包时返回对应的FrameTrace，其他情况返回None
+        """
+        if rtp_timestamp != self._current_rtp_timestamp:
+            # 新的一帧开始，上一帧如果没有收到marker包(丢包)则直接丢弃
+            self._current_rtp_timestamp = rtp_timestamp
+            self._frame_index += 1
+            if self._frame_index % self._sample_every == 0:
+                self._current_trace = FrameTrace(rtp_timestamp, recv_ns)
+            else:
+                self._current_trace = None
+        if not marker:
+            return None
+        trace = self._current_trace
+        self._current_trace = None
+        if trace is not None:
+            trace.last_recv_ns = recv_ns
+        return trace
+
+    def record(self, trace):
+        """
+        消费者取出一帧后调用，把各阶段的耗时写入统计
+        :param trace: 已经填好dequeued_ns的FrameTrace
+        :return:
+        """
+        histograms = self._histograms
+        histograms[TraceStage.NETWORK].add(trace.last_recv_ns - trace.first_recv_ns)
+        histograms[TraceStage.ASSEMBLE].add(trace.assembled_ns - trace.last_recv_ns)
+        histograms[TraceStage.ENQUEUE].add(trace.enqueued_ns - trace.assembled_ns)
+        histograms[TraceStage.QUEUE].add(trace.dequeued_ns - trace.enqueued_ns)
+        histograms[TraceStage.TOTAL].add(trace.dequeued_ns - trace.first_recv_ns)
+
+    def stats(self, percentiles=DEFAULT_PERCENTILES):
+        """
+        获取各阶段耗时的统计
+        :param percentiles: 需要计算的百分位
+        :return: {阶段: {'count': 采样帧数, 'p50': 微秒, ...}}
+        """
+        result = {}
+        for stage, histogram in self._histograms.items():
+            stage_stats = {'count': histogram.count}
+            for p, value in histogram.percentiles(percentiles).items():
+                stage_stats['p{}'.format(p)] = value / 1000.0
+            result[stage] = stage_stats
+        return result
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：udp.py
+@Author  ：huangwenxi
+@Date    ：2022/4/25 10:04 
+'''
+import logging
+import re
+import socket
+import sys
+import time
+from .base import RtspClientBase, RTSPCmd, RTSPCSeq, SOCKET_TIMEOUT, THREAD_JOIN_TIMEOUT, _shutdown_socket
+from .multicast import MulticastGroup
+logger = logging.getLogger(__name__)
+MAX_BUFFER_LEN = 10240
+
+
+TRANSPORT_PATTERN = re.compile(r'Transport:\s*(.*?)\s*\r\n')
+
+
+class RtspClientUdp(RtspClientBase):
+    def __init__(self, rtsp_server_ip, rtsp_server_port, url, multicast=False, multicast_interface='0.0.0.0'):
+        """
+        :param multicast: True表示使用组播方式接收RTP，多个客户端共享同一个组播socket
+        :param multicast_interface: 加入组播使用的本地网卡地址
+        """
+        RtspClientBase.__init__(self, rtsp_server_ip, rtsp_server_port, url)
+        logger.info('ip:{} port:{} url:{} multicast:{}'.format(rtsp_server_ip, rtsp_server_port, url, multicast))
+        self._video_rtp_port = 61234
+        self._video_rtcp_port = 61235
+        self._video_rtp_socket = None
+        self._video_rtcp_socket = None
+        self._multicast = multicast
+        self._multicast_interface = multicast_interface
+        self._multicast_group = None
+        self._multicast_address = None
+        self._multicast_ttl = None
+
+    @property
+    def multicast(self):
+        return self._multicast
+
+    @property
+    def multicast_address(self):
+        """
+        服务器在SETUP回复中指定的组播地址
+        :return:
+        """
+        return self._multicast_address
+
+    @property
+    def multicast_ttl(self):
+        return self._multicast_ttl
+
+    def connect(self):
+        if not super(RtspClientUdp, self).connect():
+            logger.error('创建socket资源失败')
+            return False
+        self._start_task(self._rtsp_msg_parse_task, 'rtsp-udp')
+        if not self._multicast:
+            # 组播模式下由共享的组播接收线程分发RTP包，在SETUP回复之后加入组播
+            self._start_task(self._rtp_data_parse_task, 'rtp-udp')
+        logger.info('启动RTSP消息解析任务成功')
+        return True
+
+    def disconnect(self, timeout=THREAD_JOIN_TIMEOUT):
+        """
+        释放创建的socket资源，停止并回收接收线程
+        :param timeout: 等待接收线程退出的最长时间(秒)
+        :return:
+        """
+        self._stop_event.set()
+        try:
+            # 退出组播组，最后一个客户端退出时才会关闭组播socket
+            self._leave_multicast_group()
+            # 释放rtp的连接资源
+            if self._video_rtp_socket:
+                _shutdown_socket(self._video_rtp_socket)
+                self._video_rtp_socket.close()
+                logger.info('释放rtp的socket成功')
+            # 释放rtcp的连接资源
+            if self._video_rtcp_socket:
+                self._video_rtcp_socket.close()
+                logger.info('释放rtcp的socket成功')
+            # 释放rtsp的连接资源
+            self._release_rtsp_session()
+            logger.info('释放rtsp的socket成功')
+        except Exception as e:
+            logger.error('释放资源失败:{}'.format(e.args))
+        self._stop_tasks(timeout)
+
+    def _rtp_data_parse_task(self):
+        """
+        解析RTP的数据
+        :return:
+        """
+        try:
+            if not self._rtp_socket:
+                logger.error('RTP的链路不存在')
+                return
+            # 复用同一个接收缓冲区，负载在_handle_rtp_packet中拷贝到帧池，下一次接收前不再引用
+            recv_buffer = bytearray(MAX_BUFFER_LEN)
+            recv_view = memoryview(recv_buffer)
+            while not self._stop_event.is_set():
+                try:
+                    length = self._rtp_socket.recv_into(recv_buffer)
+                except socket.timeout:
+                    continue
+                if not length:
+                    # 空的数据报或者socket被关闭，由停止标志决定是否退出
+                    continue
+                recv_ns = time.monotonic_ns() if self._tracer is not None else 0
+                data = recv_view[:length]
+                if self._accept_rtp_packet(data):
+                    self._handle_rtp_packet(data, recv_ns)
+        except Exception as e:
+            if not self._stop_event.is_set():
+                logger.error('RTP数据接收线程出错:{}'.format(e.args))
+        finally:
+            self._stop_event.set()
+            self._end_stream()
+            logger.info('RTP数据解析任务退出')
+
+    def _rtsp_msg_parse_task(self):
+        """
+        解析rtsp的消息
+        :return:
+        """
+        logger.info('开始运行RTSP消息解析任务')
+        self._start_rtsp_flow()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data = self._rtsp_socket.recv(MAX_BUFFER_LEN)
+                except socket.timeout:
+                    continue
+                if not len(data):
+                    if not self._stop_event.is_set():
+                        logger.warning('RTSP服务器关闭了连接')
+                    break
+                logger.info('从socket收到 {} 字节的数据 {}'.format(len(data), data))
+                data = data.decode()
+                self._rtsp_response_parse(data)
+        except Exception as e:
+            if not self._stop_event.is_set():
+                logger.error('RTSP消息接收线程出错:{}'.format(e.args))
+        finally:
+            # RTSP连接断开后整个会话结束，通知RTP接收线程一起退出
+            self._stop_event.set()
+            self._end_stream()
+            logger.info('RTSP消息解析任务退出')
+
+    def _create(self):
+        """
+        创建rtp和rtcp的服务端
+        :return:
+        """
+        if self._multicast:
+            # 组播的地址和端口由服务器在SETUP回复中指定
+            return True
+        try:
+            # 创建rtp的连接资源
+            self._video_rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._video_rtp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
+            self._video_rtp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+            self._video_rtp_socket.bind(("", self._video_rtp_port))
+            self._video_rtp_socket.settimeout(SOCKET_TIMEOUT)
+            self._rtp_socket = self._video_rtp_socket
+            logger.info('创建本地接收RTP数据的TCP 服务成功, port:{}'.format(self._video_rtp_port))
+            # 创建rtcp的连接资源
+            self._video_rtcp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._video_rtcp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
+            self._video_rtcp_socket.bind(("", self._video_rtcp_port))
+            logger.info('创建本地接收RTCP数据的TCP 服务成功 port:{}'.format(self._video_rtcp_port))
+            return True
+        except Exception as e:
+            logger.error('创建服务端失败,{}'.format(e.args))
+            return False
+
+    def _setup_audio(self):
+        """
+        和rtsp服务器建立音频的连接
+        :return:
+        """
+        pass
+
+    def _setup_video(self):
+        """
+        和rtsp服务器建立视频的连接
+        :return:
+        """
+        if self._multicast:
+            transport = 'RTP/AVP;multicast'
+        else:
+            transport = 'RTP/AVP;unicast;client_port={}-{}'.format(self._video_rtp_port, self._video_rtcp_port)
+        cmd = '{} {}/trackID=1 RTSP/1.0 \r\n' \
+              'Transport: {} \r\n' \
+              'CSeq: {} \r\n' \
+              'User-Agent: Lavf57.83.100 \r\n' \
+              'Session: {} \r\n\r\n'.format(RTSPCmd.SETUP, self.url,
+                                            transport, RTSPCSeq.SETUP_VIDEO, self._rtsp_session_id).encode()
+        self._rtsp_socket.send(cmd)
+        logger.info('发送SETUP视频消息成功')
+
+    def _parse_setup_video_response(self, data):
+        """
+        解析setup视频的回复，组播模式下先加入组播组再发送PLAY
+        :param data:
+        :return:
+        """
+        if self._multicast and '200 OK' in data:
+            if not self._join_multicast_group(data):
+                # 无法接收组播数据，结束会话并通知消费者，不再发送PLAY
+                self._stop_event.set()
+                self._end_stream()
+                return
+        super(RtspClientUdp, self)._parse_setup_video_response(data)
+
+    def _join_multicast_group(self, data):
+        """
+        从SETUP回复的Transport中解析组播地址、端口和ttl，并加入组播组
+        :param data: SETUP的回复
+        :return: True 成功 False失败
+        """
+        transport = parse_transport(data)
+        destination = transport.get('destination')
+        port = transport.get('port')
+        if not destination or not port:
+            logger.error('SETUP回复中没有组播地址或端口 {}'.format(transport))
+            return False
+        try:
+            self._video_rtp_port = int(port.split('-')[0])
+            if '-' in port:
+                self._video_rtcp_port = int(port.split('-')[1])
+            if transport.get('ttl'):
+                self._multicast_ttl = int(transport['ttl'])
+        except ValueError:
+            logger.error('SETUP回复中的组播端口或ttl无效 {}'.format(transport))
+            return False
+        self._multicast_address = destination
+        try:
+            self._multicast_group = MulticastGroup.subscribe(destination, self._video_rtp_port,
+                                                             self._on_multicast_packet, self._multicast_interface,
+                                                             self._on_multicast_error)
+        except Exception as e:
+            logger.error('加入组播组失败 group:{} port:{} {}'.format(destination, self._video_rtp_port, e.args))
+            return False
+        logger.info('加入组播组 group:{} port:{} ttl:{}'.format(destination, self._video_rtp_port,
+                                                            self._multicast_ttl))
+        return True
+
+    def _leave_multicast_group(self):
+        """
+        退出组播组
+        :return:
+        """
+        multicast_group = self._multicast_group
+        if multicast_group is None:
+            return
+        self._multicast_group = None
+        multicast_group.unsubscribe(self._on_multicast_packet)
+
+    def _on_multicast_error(self):
+        """
+        组播接收线程异常退出后的回调，结束会话并通知消费者
+        :return:
+        """
+        logger.error('组播接收线程异常退出 group:{} port:{}'.format(self._multicast_address, self._video_rtp_port))
+        self._stop_event.set()
+        self._end_stream()
+
+    def _on_multicast_packet(self, data, recv_ns):
+        """
+        组播接收线程收到RTP包后的回调
+        :param data: RTP包，指向组播接收缓冲区的memoryview，返回后不能再引用
+        :param recv_ns: 收到这个包的时间
+        :return:
+        """
+        if self._stop_event.is_set() or not self._accept_rtp_packet(data):
+            return
+        self._handle_rtp_packet(data, recv_ns if self._tracer is not None else 0)
+
+
+def parse_transport(data):
+    """
+    解析RTSP回复中的Transport头
+    :param data: RTSP回复
+    :return: {参数名: 参数值}，没有值的参数(比如multicast)值为空字符串
+    """
+    result = TRANSPORT_PATTERN.findall(data)
+    if not result:
+        return {}
+    transport = {}
+    for item in result[0].split(';'):
+        key, _, value = item.strip().partition('=')
+        if key:
+            transport[key] = value
+    return transport
+
+
+if __name__ == '__main__':
+    rtsp_client = RtspClientUdp('10.10.10.53', 554,
+                                'rtsp://10.10.10.53:554/LiveMedia/ch1/Media1')
+    time_start = time.time()
+    video_fd = open('test_udp.h264', 'wb')
+    timestamp_fd = open('test_udp.timestamp', 'w')
+    with rtsp_client:
+        if not rtsp_client.connect():
+            logger.error('连接RTSP服务器失败')
+            sys.exit(-1)
+        while time.time() < time_start + 10:
+            frame = rtsp_client.read_frame()
+            if frame is None:
+                break
+            with frame:
+                if frame.data:
+                    video_fd.write(frame.data)
+    video_fd.close()
+    timestamp_fd.close()
+
+
+
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：rtsp_server.py
+测试用的本地RTSP服务器
+'''
+import re
+import socket
+import threading
+import time
+
+LOOPBACK = '127.0.0.1'
+
+
+class FakeRtspServer:
+    """
+    只回复200 OK的RTSP服务器，SETUP的回复中带上指定的Transport
+    """
+    def __init__(self, transport=None):
+        self._transport = transport
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
+        self._socket.bind((LOOPBACK, 0))
+        self._socket.listen(8)
+        self.port = self._socket.getsockname()[1]
+        self.url = 'rtsp://{}:{}/live'.format(LOOPBACK, self.port)
+        self.setup_requests = []
+        self.play_requests = []
+        self._connections = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept_task, daemon=True).start()
+
+    @property
+    def connection_count(self):
+        with self._lock:
+            return len(self._connections)
+
+    def wait_for_play(self, count=1, timeout=3.0):
+        """
+        等待客户端完成RTSP交互
+        :param count: 期望收到的PLAY请求数量
+        :param timeout: 最长等待时间(秒)
+        :return: True 收到了足够的PLAY请求
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if len(self.play_requests) >= count:
+                return True
+            time.sleep(0.02)
+        return False
+
+    def close_sessions(self):
+        """
+        关闭所有已经建立的连接，模拟服务器断开
+        :return:
+        """
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def close(self):
+        self._socket.close()
+        self.close_sessions()
+
+    def _accept_task(self):
+        while True:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._connections.append(conn)
+            threading.Thread(target=self._session_task, args=(conn,), daemon=True).start()
+
+    def _session_task(self, conn):
+        with conn:
+            while True:
+                try:
+                    data = conn.recv(4096).decode()
+                except OSError:
+                    return
+                if not data:
+                    return
+                for request in data.split('\r\n\r\n'):
+                    if not request.strip():
+                        continue
+                    cseq = re.search(r'CSeq: (\d+)', request).group(1)
+                    headers = ''
+                    if request.startswith('SETUP'):
+                        self.setup_requests.append(request)
+                        if self._transport:
+                            headers += 'Transport: {}\r\n'.format(self._transport)
+                        headers += 'Session: 12345678;timeout=60\r\n'
+                    elif request.startswith('PLAY'):
+                        self.play_requests.append(request)
+                    # 客户端不会切分粘在一起的RTSP回复，逐条发送
+                    time.sleep(0.05)
+                    try:
+                        conn.send('RTSP/1.0 200 OK\r\nCSeq: {}\r\n{}\r\n'.format(cseq, headers).encode())
+                    except OSError:
+                        return
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：test_frame.py
+'''
+import struct
+import threading
+
+from rtsp_client import RtspClientUdp
+from rtsp_client.frame import FramePool, size_class
+
+
+def _fu_a_start_packet(payload_length, extension_words=(0xE0000001, 0x80000000)):
+    extension = struct.pack('!HH{}I'.format(len(extension_words)), 0xABAC, len(extension_words), *extension_words)
+    return struct.pack('!BBHII', 0x90, 96, 1, 3600, 1) + extension + bytes([0x7C, 0x85]) + b'x' * payload_length
+
+
+def test_frame_unpacks_like_previous_read_frame():
+    client = RtspClientUdp('127.0.0.1', 554, 'rtsp://127.0.0.1:554/live')
+    client._handle_rtp_packet(_fu_a_start_packet(10))
+    data, rtp_extension = client.read_frame(timeout=1)
+    assert bytes(data) == b'\x00\x00\x00\x01\x65' + b'x' * 10
+    assert rtp_extension == [0xE0000001, 0x80000000]
+
+
+def test_unreleased_frames_use_packet_size():
+    pool = FramePool()
+    frame = pool.acquire(15)
+    assert frame.capacity == 15
+
+
+def test_released_frames_are_reused_for_same_size_class():
+    pool = FramePool()
+    pool.acquire(1400).release()
+    frame = pool.acquire(1413)
+    assert frame.capacity == size_class(1413)
+    frame.release()
+    assert pool.acquire(1400) is frame
+
+
+def test_concurrent_double_release_pools_frame_once():
+    pool = FramePool()
+    pool.acquire(100).release()
+    for _ in range(200):
+        frame = pool.acquire(100)
+        barrier = threading.Barrier(4)
+
+        def release():
+            barrier.wait()
+            frame.release()
+        tasks = [threading.Thread(target=release) for _ in range(4)]
+        for task in tasks:
+            task.start()
+        for task in tasks:
+            task.join()
+        assert pool.free_count == 1
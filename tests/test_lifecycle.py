@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：test_lifecycle.py
+接收线程的启动、停止、服务器断开和重新连接
+'''
+import queue
+import socket
+
+import pytest
+
+from rtsp_client import RtspClientTcp, RtspClientUdp
+from tests.rtsp_server import FakeRtspServer, LOOPBACK
+
+
+@pytest.fixture
+def server():
+    rtsp_server = FakeRtspServer()
+    yield rtsp_server
+    rtsp_server.close()
+
+
+def _closed_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind((LOOPBACK, 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _assert_no_live_tasks(client):
+    assert not client.running
+    assert all(not task.is_alive() for task in client._tasks)
+
+
+@pytest.mark.parametrize('client_class', [RtspClientTcp, RtspClientUdp])
+def test_disconnect_joins_receive_threads(server, client_class):
+    client = client_class(LOOPBACK, server.port, server.url)
+    assert client.connect()
+    assert server.wait_for_play()
+    tasks = list(client._tasks)
+    assert tasks and all(task.is_alive() for task in tasks)
+    client.disconnect()
+    assert all(not task.is_alive() for task in tasks)
+    _assert_no_live_tasks(client)
+    assert client.read_frame(timeout=1) is None
+
+
+def test_server_eof_ends_stream(server):
+    client = RtspClientTcp(LOOPBACK, server.port, server.url)
+    try:
+        assert client.connect()
+        assert server.wait_for_play()
+        server.close_sessions()
+        assert client.read_frame(timeout=3) is None
+        # 结束标志会保留在队列中，后续的读取也立即返回
+        assert client.read_frame(timeout=1) is None
+        assert not client.running
+    finally:
+        client.disconnect()
+
+
+@pytest.mark.parametrize('client_class', [RtspClientTcp, RtspClientUdp])
+def test_failed_connect_ends_stream(client_class):
+    port = _closed_port()
+    client = client_class(LOOPBACK, port, 'rtsp://{}:{}/live'.format(LOOPBACK, port))
+    assert client.connect() is False
+    assert client.read_frame(timeout=1) is None
+    assert not client.running
+    assert client._rtsp_socket._closed
+
+
+def test_context_manager_without_connect():
+    with RtspClientTcp(LOOPBACK, 554, 'rtsp://{}:554/live'.format(LOOPBACK)) as client:
+        pass
+    assert client.read_frame(timeout=1) is None
+
+
+def test_reconnect_after_disconnect(server):
+    client = RtspClientTcp(LOOPBACK, server.port, server.url)
+    try:
+        assert client.connect()
+        assert server.wait_for_play(1)
+        client.disconnect()
+        assert client.read_frame(timeout=1) is None
+
+        assert client.connect()
+        assert client.running
+        assert server.wait_for_play(2)
+        # 上一次会话的结束标志已经清除，没有数据时读取超时
+        with pytest.raises(queue.Empty):
+            client.read_frame(timeout=0.3)
+        assert server.connection_count == 2
+    finally:
+        client.disconnect()
+
+
+def test_reconnect_after_server_eof(server):
+    client = RtspClientTcp(LOOPBACK, server.port, server.url)
+    try:
+        assert client.connect()
+        assert server.wait_for_play(1)
+        server.close_sessions()
+        assert client.read_frame(timeout=3) is None
+
+        assert client.connect()
+        assert server.wait_for_play(2)
+        assert client.running
+        with pytest.raises(queue.Empty):
+            client.read_frame(timeout=0.3)
+
+        server.close_sessions()
+        assert client.read_frame(timeout=3) is None
+    finally:
+        client.disconnect()
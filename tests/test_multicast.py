@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：test_multicast.py
+用回环网卡上的组播发送端测试RtspClientUdp的组播模式
+'''
+import errno
+import socket
+import struct
+import time
+
+import pytest
+
+from rtsp_client import RtspClientUdp, MulticastGroup
+from tests.rtsp_server import FakeRtspServer, LOOPBACK
+
+MULTICAST_GROUP = '239.255.12.34'
+
+
+def _free_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class FailingSocket:
+    """
+    接收数据时抛出异常的socket，其他操作转给真实的socket
+    """
+    def __init__(self, real_socket):
+        self._real_socket = real_socket
+        self.options = []
+
+    def recv_into(self, buffer):
+        raise OSError(errno.EIO, 'simulated receive error')
+
+    def setsockopt(self, level, option, value):
+        self.options.append(option)
+        self._real_socket.setsockopt(level, option, value)
+
+    def __getattr__(self, name):
+        return getattr(self._real_socket, name)
+
+
+def _rtp_packet(sequence_number, timestamp):
+    # 单个NAL单元(IDR)的RTP包
+    return struct.pack('!BBHII', 0x80, 0x80 | 96, sequence_number, timestamp, 1) + bytes([0x65]) + b'x' * 32
+
+
+def _wait_joined(group_key, subscriber_count, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        multicast_group = MulticastGroup._groups.get(group_key)
+        if multicast_group is not None and multicast_group.subscriber_count == subscriber_count:
+            return multicast_group
+        time.sleep(0.02)
+    return None
+
+
+@pytest.fixture
+def multicast_port():
+    port = _free_udp_port()
+    try:
+        probe = MulticastGroup.subscribe(MULTICAST_GROUP, port, lambda data, recv_ns: None, LOOPBACK)
+    except OSError as e:
+        pytest.skip('回环网卡不支持组播 {}'.format(e.args))
+    probe.unsubscribe(probe._subscribers[0][0])
+    return port
+
+
+def test_clients_share_one_multicast_group(multicast_port):
+    server = FakeRtspServer('RTP/AVP;multicast;destination={};port={}-{};ttl=4'.format(
+        MULTICAST_GROUP, multicast_port, multicast_port + 1))
+    clients = [RtspClientUdp(LOOPBACK, server.port, 'rtsp://{}:{}/live'.format(LOOPBACK, server.port),
+                             multicast=True, multicast_interface=LOOPBACK) for _ in range(2)]
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for client in clients:
+            assert client.connect()
+        multicast_group = _wait_joined((MULTICAST_GROUP, multicast_port, LOOPBACK), 2)
+        assert multicast_group is not None
+        assert all('RTP/AVP;multicast' in request for request in server.setup_requests)
+        assert clients[0].multicast_address == MULTICAST_GROUP
+        assert clients[0].multicast_ttl == 4
+
+        sender.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(LOOPBACK))
+        sender.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        packets = [_rtp_packet(index, index * 3600) for index in range(5)]
+        for packet in packets:
+            sender.sendto(packet, (MULTICAST_GROUP, multicast_port))
+
+        for client in clients:
+            for packet in packets:
+                frame = client.read_frame(timeout=2)
+                assert bytes(frame.data) == b'\x00\x00\x00\x01' + packet[12:]
+                frame.release()
+
+        clients[0].disconnect()
+        assert multicast_group.subscriber_count == 1
+        assert (MULTICAST_GROUP, multicast_port, LOOPBACK) in MulticastGroup._groups
+        clients[1].disconnect()
+        assert multicast_group.subscriber_count == 0
+        assert (MULTICAST_GROUP, multicast_port, LOOPBACK) not in MulticastGroup._groups
+        assert multicast_group._socket.fileno() == -1
+    finally:
+        sender.close()
+        for client in clients:
+            client.disconnect()
+        server.close()
+
+
+def test_setup_without_multicast_transport_ends_stream():
+    server = FakeRtspServer(None)
+    client = RtspClientUdp(LOOPBACK, server.port, 'rtsp://{}:{}/live'.format(LOOPBACK, server.port),
+                           multicast=True, multicast_interface=LOOPBACK)
+    try:
+        assert client.connect()
+        assert client.read_frame(timeout=3) is None
+        assert not client.running
+    finally:
+        client.disconnect()
+        server.close()
+
+
+def test_multicast_socket_error_ends_subscribed_streams(multicast_port):
+    server = FakeRtspServer('RTP/AVP;multicast;destination={};port={}-{}'.format(
+        MULTICAST_GROUP, multicast_port, multicast_port + 1))
+    client = RtspClientUdp(LOOPBACK, server.port, 'rtsp://{}:{}/live'.format(LOOPBACK, server.port),
+                           multicast=True, multicast_interface=LOOPBACK)
+    try:
+        assert client.connect()
+        multicast_group = _wait_joined((MULTICAST_GROUP, multicast_port, LOOPBACK), 1)
+        assert multicast_group is not None
+        # 替换成接收时出错的socket，模拟接收线程出错
+        real_socket = multicast_group._socket
+        failing_socket = FailingSocket(real_socket)
+        multicast_group._socket = failing_socket
+        assert client.read_frame(timeout=3) is None
+        assert (MULTICAST_GROUP, multicast_port, LOOPBACK) not in MulticastGroup._groups
+        # 组播接收线程出错后立即退出组播并关闭socket，不需要等订阅者disconnect
+        assert socket.IP_DROP_MEMBERSHIP in failing_socket.options
+        assert real_socket.fileno() == -1
+        multicast_group._task.join(1)
+        assert not multicast_group._task.is_alive()
+    finally:
+        client.disconnect()
+        server.close()
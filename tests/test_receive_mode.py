@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：test_receive_mode.py
+用构造的SPS/PPS/IDR/P帧RTP包测试接收模式和抽帧
+'''
+import struct
+
+from rtsp_client import RtspClientTcp, ReceiveMode, PacketFilter
+
+SPS = bytes([0x67, 0x42])
+PPS = bytes([0x68, 0xCE])
+IDR = bytes([0x65, 0x88])
+# FU-A分片: NAL头(NRI=3, 类型28) + FU头(起始位, 类型5)
+IDR_FU_A_START = bytes([0x7C, 0x85])
+IDR_FU_A_MIDDLE = bytes([0x7C, 0x05])
+# P帧: NRI=2的参考帧和NRI=0的非参考帧
+P_REFERENCE_FU_A = bytes([0x5C, 0x81])
+P_NON_REFERENCE_FU_A = bytes([0x1C, 0x81])
+P_REFERENCE = bytes([0x41, 0x9A])
+P_NON_REFERENCE = bytes([0x01, 0x9A])
+
+
+def _rtp_packet(timestamp, nal, extension_words=()):
+    first_byte = 0x80
+    extension = b''
+    if extension_words:
+        first_byte |= 0x10
+        extension = struct.pack('!HH{}I'.format(len(extension_words)), 0xABAC, len(extension_words),
+                                *extension_words)
+    return struct.pack('!BBHII', first_byte, 96, 1, timestamp, 1) + extension + nal + b'x' * 8
+
+
+def _accepted(packet_filter, packets):
+    return [packet_filter.accept(packet) for packet in packets]
+
+
+def test_keyframe_mode_keeps_parameter_sets_and_idr():
+    packet_filter = PacketFilter(ReceiveMode.KEYFRAME)
+    packets = [_rtp_packet(0, SPS), _rtp_packet(0, PPS), _rtp_packet(0, IDR_FU_A_START),
+               _rtp_packet(0, IDR_FU_A_MIDDLE), _rtp_packet(3000, P_REFERENCE_FU_A),
+               _rtp_packet(6000, P_NON_REFERENCE_FU_A), _rtp_packet(9000, P_REFERENCE), _rtp_packet(12000, IDR)]
+    assert _accepted(packet_filter, packets) == [True, True, True, True, False, False, False, True]
+    assert packet_filter.dropped_packets == 3
+
+
+def test_reference_mode_drops_nri_zero():
+    packet_filter = PacketFilter(ReceiveMode.REFERENCE)
+    packets = [_rtp_packet(0, SPS), _rtp_packet(0, IDR_FU_A_START), _rtp_packet(3000, P_REFERENCE_FU_A),
+               _rtp_packet(6000, P_NON_REFERENCE_FU_A), _rtp_packet(9000, P_REFERENCE),
+               _rtp_packet(12000, P_NON_REFERENCE)]
+    assert _accepted(packet_filter, packets) == [True, True, True, False, True, False]
+    assert packet_filter.dropped_packets == 2
+
+
+def _gop(timestamp):
+    return [_rtp_packet(timestamp, SPS), _rtp_packet(timestamp, PPS), _rtp_packet(timestamp, IDR_FU_A_START),
+            _rtp_packet(timestamp, IDR_FU_A_MIDDLE), _rtp_packet(timestamp + 3000, P_REFERENCE_FU_A)]
+
+
+def test_gop_step_keeps_whole_gops():
+    packet_filter = PacketFilter(ReceiveMode.ALL, gop_step=2)
+    results = [_accepted(packet_filter, _gop(timestamp)) for timestamp in (0, 6000, 12000, 18000)]
+    assert results == [[True] * 5, [False] * 5, [True] * 5, [False] * 5]
+    assert packet_filter.dropped_packets == 10
+
+
+def test_packets_before_first_gop_are_dropped_when_decimating():
+    packet_filter = PacketFilter(ReceiveMode.ALL, gop_step=2)
+    assert not packet_filter.accept(_rtp_packet(0, P_REFERENCE))
+    assert packet_filter.accept(_rtp_packet(3000, IDR))
+
+
+def test_min_interval_across_timestamp_wraparound():
+    packet_filter = PacketFilter(ReceiveMode.KEYFRAME, min_interval=1.0)
+    first = 0x100000000 - 45000
+    # 按32位无符号差值计算和上一个保留的GOP的间隔，回绕后依然正确
+    timestamps = [first, 0, 45000, 90000]
+    results = [packet_filter.accept(_rtp_packet(timestamp, IDR)) for timestamp in timestamps]
+    assert results == [True, False, True, False]
+
+
+def test_extension_header_is_skipped():
+    extension_words = (0xE0000001, 0x80000000, 0x12345678)
+    packet_filter = PacketFilter(ReceiveMode.KEYFRAME)
+    assert packet_filter.accept(_rtp_packet(0, IDR_FU_A_START, extension_words))
+    assert not packet_filter.accept(_rtp_packet(3000, P_REFERENCE_FU_A, extension_words))
+    # 扩展头的第一个字(0xE0...)如果被当成NAL头会被误判
+    packet_filter = PacketFilter(ReceiveMode.REFERENCE)
+    assert not packet_filter.accept(_rtp_packet(3000, P_NON_REFERENCE_FU_A, extension_words))
+
+
+def test_start_and_end_offsets_in_shared_buffer():
+    packet_filter = PacketFilter(ReceiveMode.KEYFRAME)
+    p_packet = _rtp_packet(3000, P_REFERENCE)
+    idr_packet = _rtp_packet(6000, IDR)
+    buffer = IDR * 3 + p_packet + idr_packet
+    p_start = len(IDR) * 3
+    assert not packet_filter.accept(buffer, p_start, p_start + len(p_packet))
+    assert packet_filter.accept(memoryview(buffer), p_start + len(p_packet), len(buffer))
+    # end截断在NAL头之前，即使缓冲区后面还有数据也不能越界读取
+    assert not packet_filter.accept(buffer, p_start + len(p_packet), p_start + len(p_packet) + 12)
+
+
+def test_short_packets_are_dropped():
+    packet_filter = PacketFilter(ReceiveMode.KEYFRAME)
+    packet = _rtp_packet(0, IDR)
+    assert not packet_filter.accept(packet, 5, 5)
+    assert not packet_filter.accept(packet[:8])
+    assert not packet_filter.accept(b'')
+    assert packet_filter.dropped_packets == 3
+
+
+def test_zero_length_interleaved_packet_keeps_tcp_split_running():
+    client = RtspClientTcp('127.0.0.1', 554, 'rtsp://127.0.0.1:554/live')
+    client.set_receive_mode(ReceiveMode.KEYFRAME)
+    idr_packet = _rtp_packet(0, IDR)
+    # 长度为0的包在缓冲区末尾，读取data[start]会越界
+    data = b'$\x00' + struct.pack('!H', len(idr_packet)) + idr_packet + b'$\x00\x00\x00'
+    result = client._split_rtsp_rtp(data)
+    assert [(kind, bytes(packet)) for kind, packet in result] == [('RTP', idr_packet)]
+    assert client.dropped_packets == 1
+    assert client._rtsp_data_buffer == b''
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：test_timestamps.py
+'''
+import struct
+
+import pytest
+
+from rtsp_client import RtspClientUdp, exposure_timestamps
+from rtsp_client.timestamps import NTP_UNIX_EPOCH_OFFSET
+
+numpy = pytest.importorskip('numpy')
+
+UNIX_SECONDS = 1700000000
+
+
+def _rtp_packet(sequence_number, nal, extension_words=()):
+    first_byte = 0x80
+    extension = b''
+    if extension_words:
+        first_byte |= 0x10
+        extension = struct.pack('!HH{}I'.format(len(extension_words)), 0xABAC, len(extension_words),
+                                *extension_words)
+    return struct.pack('!BBHII', first_byte, 96, sequence_number, 3600, 1) + extension + nal + b'x' * 8
+
+
+def _read_frames(packets):
+    client = RtspClientUdp('127.0.0.1', 554, 'rtsp://127.0.0.1:554/live')
+    for packet in packets:
+        client._handle_rtp_packet(packet)
+    return client.read_frames(len(packets), timeout=1)
+
+
+def test_ntp_words_convert_to_unix_seconds():
+    frames = _read_frames([_rtp_packet(1, bytes([0x7C, 0x85]),
+                                       (UNIX_SECONDS + NTP_UNIX_EPOCH_OFFSET, 0x80000000))])
+    indices, timestamps = exposure_timestamps(frames)
+    assert indices.tolist() == [0]
+    assert timestamps.dtype == numpy.float64
+    assert timestamps.tolist() == [UNIX_SECONDS + 0.5]
+
+
+def test_only_frames_with_extension_are_returned():
+    ntp_seconds = UNIX_SECONDS + NTP_UNIX_EPOCH_OFFSET
+    # 一帧图像的FU-A起始分片带扩展头，中间和结束分片不带
+    frames = _read_frames([
+        _rtp_packet(1, bytes([0x7C, 0x85]), (ntp_seconds, 0)),
+        _rtp_packet(2, bytes([0x7C, 0x05])),
+        _rtp_packet(3, bytes([0x7C, 0x45])),
+        _rtp_packet(4, bytes([0x5C, 0x81]), (ntp_seconds + 1, 0x40000000)),
+    ])
+    indices, timestamps = exposure_timestamps(frames)
+    assert indices.tolist() == [0, 3]
+    assert timestamps.tolist() == [UNIX_SECONDS, UNIX_SECONDS + 1.25]
+
+
+def test_word_index_selects_timestamp_position():
+    ntp_seconds = UNIX_SECONDS + NTP_UNIX_EPOCH_OFFSET
+    frames = _read_frames([_rtp_packet(1, bytes([0x7C, 0x85]), (0xE0000001, ntp_seconds, 0x80000000))])
+    indices, timestamps = exposure_timestamps(frames, word_index=1)
+    assert timestamps.tolist() == [UNIX_SECONDS + 0.5]
+    # 扩展头长度不够word_index之后的两个字时当作没有曝光时间
+    indices, timestamps = exposure_timestamps(frames, word_index=2)
+    assert indices.tolist() == [] and timestamps.tolist() == []
+
+
+def test_empty_frame_list():
+    indices, timestamps = exposure_timestamps([])
+    assert indices.shape == (0,) and timestamps.shape == (0,)
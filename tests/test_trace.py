@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+'''
+@Project ：calc_camera_pix_offset 
+@File    ：test_trace.py
+'''
+import pytest
+
+from rtsp_client.trace import FrameTracer, RollingPercentile, TraceStage
+
+
+def _feed_frame(tracer, rtp_timestamp, recv_ns, packet_count=2):
+    """
+    按顺序输入一帧的所有包，最后一个包带marker位
+    :return: marker包返回的FrameTrace
+    """
+    trace = None
+    for index in range(packet_count):
+        marker = index == packet_count - 1
+        trace = tracer.on_packet(rtp_timestamp, marker, recv_ns + index * 1000)
+        if not marker:
+            assert trace is None
+    return trace
+
+
+def test_sample_every_picks_every_nth_rtp_timestamp():
+    tracer = FrameTracer(sample_every=3)
+    sampled = [_feed_frame(tracer, frame_index * 3600, frame_index * 10 ** 6) for frame_index in range(9)]
+    assert [trace.rtp_timestamp for trace in sampled if trace is not None] == [0, 3 * 3600, 6 * 3600]
+
+
+def test_frame_without_marker_packet_is_dropped():
+    tracer = FrameTracer()
+    # 第一帧的marker包丢失
+    assert tracer.on_packet(1000, False, 1) is None
+    assert tracer.on_packet(1000, False, 2) is None
+    trace = _feed_frame(tracer, 2000, 10)
+    assert trace.rtp_timestamp == 2000
+    assert trace.first_recv_ns == 10
+
+
+def test_stage_durations_from_injected_stamps():
+    tracer = FrameTracer()
+    trace = _feed_frame(tracer, 3600, 1000, packet_count=3)
+    assert (trace.first_recv_ns, trace.last_recv_ns) == (1000, 3000)
+    trace.assembled_ns = 3500
+    trace.enqueued_ns = 4500
+    trace.dequeued_ns = 9000
+    tracer.record(trace)
+    stats = tracer.stats(percentiles=(50,))
+    # 统计结果的单位是微秒
+    assert stats[TraceStage.NETWORK] == {'count': 1, 'p50': 2.0}
+    assert stats[TraceStage.ASSEMBLE] == {'count': 1, 'p50': 0.5}
+    assert stats[TraceStage.ENQUEUE] == {'count': 1, 'p50': 1.0}
+    assert stats[TraceStage.QUEUE] == {'count': 1, 'p50': 4.5}
+    assert stats[TraceStage.TOTAL] == {'count': 1, 'p50': 8.0}
+
+
+def test_sample_every_must_be_positive():
+    with pytest.raises(ValueError):
+        FrameTracer(sample_every=0)
+
+
+def test_percentiles_use_nearest_rank():
+    histogram = RollingPercentile(window=100)
+    for value in range(1, 11):
+        histogram.add(value)
+    assert histogram.percentiles((0, 10, 25, 50, 90, 91, 100)) == {0: 1, 10: 1, 25: 3, 50: 5, 90: 9, 91: 10, 100: 10}
+
+
+def test_percentile_window_keeps_latest_samples():
+    histogram = RollingPercentile(window=4)
+    assert histogram.percentiles() == {}
+    for value in (100, 200, 1, 2, 3, 4):
+        histogram.add(value)
+    assert histogram.count == 6
+    assert histogram.percentiles((50, 100)) == {50: 2, 100: 4}